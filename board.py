@@ -1,98 +1,225 @@
 from __future__ import annotations
 
+import random
+from array import array
 from dataclasses import dataclass, field
+from typing import NamedTuple
 
-from moves import (
-    Position,
-    get_valid_moves_rook,
-    get_valid_moves_pawn,
-    get_valid_moves_bishop,
-    get_valid_moves_knight,
-    get_valid_moves_queen,
-    get_possible_moves_king,
-)
-from pieces import Colour, Piece, PieceType
+from moves import Position, get_valid_moves_cached, iter_bits
+from pieces import PIECE_STR, Colour, Piece, PieceType
 
-Grid = {}
-# dict[Position, Piece]
 
+# One bitboard per (colour, piece type), indexed by colour * 6 + piece type
+# (PieceType values are the per-colour index). Bit y*8+x is set when that
+# piece stands on square (x, y).
+class PieceInfo(NamedTuple):
+    colour: Colour
+    type: PieceType
 
-def empty_board() -> Grid:
-    grid: Grid = {}
-    for x in range(8):
-        for y in range(8):
-            grid[(x, y)] = Piece(x, y)
-    return grid
+
+EMPTY_INFO = PieceInfo(Colour.NONE, PieceType.EMPTY)
+
+# one prebuilt PieceInfo per bitboard index, so lookups never allocate
+INFO_BY_INDEX: list[PieceInfo] = [
+    PieceInfo(Colour(i // 6), PieceType(i % 6)) for i in range(12)
+]
+
+# shared sentinel handed out for every empty square; callers only ever read
+# .colour/.type on it, so the off-board coordinates are harmless
+EMPTY_PIECE = Piece(-1, -1)
+
+
+def empty_bitboards() -> array:
+    return array("Q", [0] * 12)
+
+
+# Zobrist keys: one 64-bit value per (piece index, square) plus a side-to-move
+# toggle. Seeded so hashes are stable across runs. The board keeps its hash
+# incrementally up to date, one XOR per piece placed or removed.
+_zobrist_rng = random.Random(0xC0FFEE)
+ZOB_PIECE = [[_zobrist_rng.getrandbits(64) for _ in range(64)] for _ in range(12)]
+ZOB_SIDE = _zobrist_rng.getrandbits(64)
 
 
 @dataclass
 class Board:
-    pieces: Grid = field(default_factory=empty_board)
+    bb: array = field(default_factory=empty_bitboards)
+    occ_w: int = 0
+    occ_b: int = 0
+    occ: int = 0
+    hash: int = 0
+    # cached king squares indexed by Colour; -1 while that king is off the board
+    king_sq: list[int] = field(default_factory=lambda: [-1, -1])
+    # flat mailbox mirror of the bitboards: bb index per square, -1 when empty
+    mailbox: list[int] = field(default_factory=lambda: [-1] * 64)
 
     @staticmethod  # https://www.chess.com/terms/fen-chess fen strings start from top left (0,7)
     def from_fen(fen: str) -> Board:
         board = Board()
-        fenlist = fen.split("/")
-
-        for indy, y in enumerate(fenlist):
-            extra = 0
-            for indx, x in enumerate(y):
-                if x.isnumeric():
-                    for i in range(int(x)):
-                        if i > 0:
-                            extra += 1
-                        # default Piece is an empty square
-                        board.place(Piece(indx + extra, 7 - indy))
+
+        for indy, rank in enumerate(fen.split("/")):
+            file = 0
+            y = 7 - indy
+            for ch in rank:
+                if ch.isdigit():
+                    # a digit is a run of empty squares: just skip the files
+                    file += int(ch)
                 else:
-                    # from_fen places an actual Piece
-                    board.place(Piece.from_fen(indx + extra, 7 - indy, x))
+                    board.place(Piece.from_fen(file, y, ch))
+                    file += 1
         return board
 
     def place(self, piece: Piece) -> None:
-        self.pieces[(piece.x, piece.y)] = piece
+        if piece.type == PieceType.EMPTY:
+            return
+        sq = piece.y * 8 + piece.x
+        bit = 1 << sq
+        idx = piece.colour * 6 + piece.type
+        self.bb[idx] |= bit
+        self.mailbox[sq] = idx
+        self.hash ^= ZOB_PIECE[idx][sq]
+        if piece.type == PieceType.KING:
+            self.king_sq[piece.colour] = sq
+        if piece.colour == Colour.WHITE:
+            self.occ_w |= bit
+        else:
+            self.occ_b |= bit
+        self.occ |= bit
+
+    def piece_at(self, sq: int) -> PieceInfo:
+        idx = self.mailbox[sq]
+        if idx < 0:
+            return EMPTY_INFO
+        return INFO_BY_INDEX[idx]
 
     def piece(self, x: int, y: int) -> Piece:
-        return self.pieces[(x, y)]
+        info = self.piece_at(y * 8 + x)
+        if info.type == PieceType.EMPTY:
+            return EMPTY_PIECE
+        return Piece(x, y, info.colour, info.type)
 
     def piece_type(self, x: int, y: int) -> PieceType:
-        return self.piece(x, y).type
+        return self.piece_at(y * 8 + x).type
 
     def empty(self, x: int, y: int) -> bool:
-        return self.piece(x, y).type == PieceType.EMPTY
-
-    def find_king(self, colour: Colour) -> Piece:
-        for piece in self.pieces.values():
-            if piece.type == PieceType.KING and colour == piece.colour:
-                return piece
-
-    def get_valid_moves(self, x: int, y: int) -> list[Position]:
-        return MOVE_LISTS[self.piece_type(x, y)]
-
-    def move(self, current_pos: tuple(int, int), to: tuple(int, int)) -> None:
-        current_piece = self.piece(*current_pos)
-        self.pieces[(to[0], to[1])] = current_piece
-        self.pieces[(current_pos[0], current_pos[1])] = Piece(*current_pos)
-
-
-MOVE_LISTS = {
-    PieceType.PAWN: get_valid_moves_pawn,
-    PieceType.BISHOP: get_valid_moves_bishop,
-    PieceType.KNIGHT: get_valid_moves_knight,
-    PieceType.ROOK: get_valid_moves_rook,
-    PieceType.QUEEN: get_valid_moves_queen,
-    PieceType.KING: get_possible_moves_king,
-}
-
-
-def draw_board_white(board: Board) -> None:
-    for y in range(7, -1, -1):
-        for x in range(8):
-            print(board.piece(x, y), end=" ")
-        print("\t")
-
-
-def draw_board_black(board: Board) -> None:
-    for y in range(8):
-        for x in range(8):
-            print(board.piece(x, y), end=" ")
-        print("\t")
+        return not (self.occ >> (y * 8 + x)) & 1
+
+    def find_king(self, colour: Colour) -> int:
+        return self.king_sq[colour]
+
+    def copy(self) -> Board:
+        return Board(
+            bb=array("Q", self.bb),
+            occ_w=self.occ_w,
+            occ_b=self.occ_b,
+            occ=self.occ,
+            hash=self.hash,
+            king_sq=list(self.king_sq),
+            mailbox=list(self.mailbox),
+        )
+
+    @staticmethod
+    def starting_position() -> Board:
+        return _STARTING_BOARD.copy()
+
+    def get_valid_moves(self, x: int, y: int) -> int:
+        sq = y * 8 + x
+        info = self.piece_at(sq)
+        return get_valid_moves_cached(
+            self.hash, sq, info.type, info.colour, self.occ_w, self.occ_b
+        )
+
+    @staticmethod
+    def iter_moves(bb: int):
+        # decode a destination bitboard to (x, y) squares at the UI boundary
+        for sq in iter_bits(bb):
+            yield (sq & 7, sq >> 3)
+
+    def move(self, current_pos: tuple[int, int], to: tuple[int, int]) -> None:
+        from_sq = current_pos[1] * 8 + current_pos[0]
+        to_sq = to[1] * 8 + to[0]
+        moving = self.piece_at(from_sq)
+        self._clear(to_sq)
+        self._clear(from_sq)
+        if moving.type != PieceType.EMPTY:
+            bit = 1 << to_sq
+            idx = moving.colour * 6 + moving.type
+            self.bb[idx] |= bit
+            self.mailbox[to_sq] = idx
+            self.hash ^= ZOB_PIECE[idx][to_sq]
+            if moving.type == PieceType.KING:
+                self.king_sq[moving.colour] = to_sq
+            if moving.colour == Colour.WHITE:
+                self.occ_w |= bit
+            else:
+                self.occ_b |= bit
+            self.occ |= bit
+        self.hash ^= ZOB_SIDE
+
+    def _clear(self, sq: int) -> None:
+        bit = 1 << sq
+        if not self.occ & bit:
+            return
+        idx = self.mailbox[sq]
+        self.bb[idx] &= ~bit
+        self.mailbox[sq] = -1
+        self.hash ^= ZOB_PIECE[idx][sq]
+        info = INFO_BY_INDEX[idx]
+        if info.type == PieceType.KING and self.king_sq[info.colour] == sq:
+            self.king_sq[info.colour] = -1
+        if info.colour == Colour.WHITE:
+            self.occ_w &= ~bit
+        else:
+            self.occ_b &= ~bit
+        self.occ &= ~bit
+
+
+STARTING_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR"
+
+# parsed once at import; starting_position() hands out cheap copies of it
+# instead of re-running the FEN parser for every new game
+_STARTING_BOARD = Board.from_fen(STARTING_FEN)
+
+
+# rendered boards keyed on (Zobrist hash, orientation); an unchanged position
+# redraws for free. Cleared wholesale if it ever fills so long sessions cannot
+# grow it without bound.
+_RENDER_CACHE: dict[tuple[int, bool], str] = {}
+_RENDER_CACHE_MAX = 1024
+
+
+def _render(board: Board, ranks) -> str:
+    # read PieceInfo tuples straight off the mailbox; no Piece objects or
+    # __str__ dispatch per cell
+    glyphs = PIECE_STR
+    piece_at = board.piece_at
+    rows = []
+    for y in ranks:
+        base = y * 8
+        rows.append(
+            " ".join(
+                glyphs[info.type][info.colour]
+                for info in map(piece_at, range(base, base + 8))
+            )
+        )
+    return "\n".join(rows)
+
+
+def _rendered(board: Board, white: bool) -> str:
+    key = (board.hash, white)
+    cached = _RENDER_CACHE.get(key)
+    if cached is None:
+        if len(_RENDER_CACHE) >= _RENDER_CACHE_MAX:
+            _RENDER_CACHE.clear()
+        cached = _RENDER_CACHE[key] = _render(
+            board, range(7, -1, -1) if white else range(8)
+        )
+    return cached
+
+
+def draw_board_white(board: Board) -> str:
+    return _rendered(board, True)
+
+
+def draw_board_black(board: Board) -> str:
+    return _rendered(board, False)
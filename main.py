@@ -12,16 +12,15 @@ def newGame():
     player2 = input("Enter name for Black player: ")
     turn = 0
 
-    x = Board.from_fen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR")
+    x = Board.starting_position()
     while input != "q":
         match turn:
             case 0:
                 # White
-                draw_board_white(x)
+                print(draw_board_white(x))
                 move = input(f"{player1}, It's your turn!\n")
                 # Add logic for chess inputs
                 move_arr = move.split(" ")
-                print("Move: ", move_arr)
                 # input: 0 1 0 3
                 x.move(
                     (int(move_arr[0]), int(move_arr[1])),
@@ -29,7 +28,7 @@ def newGame():
                 )
             case 1:
                 # Black
-                draw_board_black(x)
+                print(draw_board_black(x))
                 move = input(f"{player2}, It's your turn!\n")
                 move[0]
         turn = not turn
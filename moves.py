@@ -1,11 +1,22 @@
+from array import array
+from functools import lru_cache
 from typing import Protocol
 
-from pieces import Piece
+from pieces import Colour, Piece, PieceType
 
-Position = tuple([int, int])
+Position = tuple[int, int]
+
+U64 = (1 << 64) - 1
+
+ROOK_DELTAS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+BISHOP_DELTAS = ((1, 1), (1, -1), (-1, 1), (-1, -1))
 
 
 class Board(Protocol):
+    occ: int
+    occ_w: int
+    occ_b: int
+
     def empty(self, x: int, y: int) -> bool:
         """Whether the square (x, y) is empty."""
 
@@ -13,221 +24,364 @@ class Board(Protocol):
         """Returns the piece at position (x, y)."""
 
 
-def get_valid_moves_pawn(square: Board, x: int, y: int) -> list:
-    valid_moves: list = []
-    # Moves for white pawns
-    if square.piece(x, y).colour.value == 0:
-        # Pawns can move 2 squares on 1st move
-        if y == 1 and square.empty(x, y + 2):
-            valid_moves.append((x, y + 2))
-        # checking top left and right captures
-        if 0 < x > 7:
-            for i in range(-1, 1, 2):
-                if square.piece(x + i, y + 1).colour.value == 1:
-                    valid_moves.append((x + i, y + 1))
-        # edge pawn so doesn't check outside of the board
-        elif x == 0:
-            if square.piece(x + 1, y + 1).colour.value == 1:
-                valid_moves.append((x + 1, y + 1))
-        elif x == 7:
-            if square.piece(x - 1, y + 1).colour.value == 1:
-                valid_moves.append((x - 1, y + 1))
-        # check the square infont of current pawn
-        if square.empty(x, y + 1):
-            valid_moves.append((x, y + 1))
-        return valid_moves
-
-    # Moves for black pawns
-    if square.piece(x, y).colour.value == 1:
-        if y == 6 and square.empty(x, y - 2):
-            valid_moves.append((x, y - 2))
-        # checking top left and right captures
-        if 0 < x > 7:
-            for i in range(-1, 1, 2):
-                if square.piece(x + i, y - 1).colour.value == 0:
-                    valid_moves.append((x + i, y - 1))
-        # edge pawn so doesn't check outside of the board
-        elif x == 0:
-            if square.piece(x + 1, y - 1).colour.value == 0:
-                valid_moves.append((x + 1, y - 1))
-        elif x == 7:
-            if square.piece(x - 1, y - 1).colour.value == 0:
-                valid_moves.append((x - 1, y - 1))
-        # check the square infont of current pawn
-        if square.empty(x, y - 1):
-            valid_moves.append((x, y - 1))
-        return valid_moves
-
-
-def get_valid_moves_bishop(square: Board, x: int, y: int) -> list:
-    valid_moves: list = []
-    init_x = x
-    init_y = y
-
-    # Check squares top left of the piece
-    while x > 0 or y < 8:
-        x -= 1
-        y += 1
-        if square.empty(x, y):
-            valid_moves.append((x, y))
-        elif (
-            square.piece(x, y).colour.value != square.piece(init_x, init_y).colour.value
-        ):
-            valid_moves.append((x, y))
-            break
-        else:
-            break
+def _sliding_attacks(sq: int, occ: int, deltas) -> int:
+    # reference ray scan, only used to fill the magic tables at import
+    attacks = 0
+    x0, y0 = sq & 7, sq >> 3
+    for dx, dy in deltas:
+        x, y = x0 + dx, y0 + dy
+        while 0 <= x < 8 and 0 <= y < 8:
+            bit = 1 << (y * 8 + x)
+            attacks |= bit
+            if occ & bit:
+                break
+            x += dx
+            y += dy
+    return attacks
 
-    # Check squares top right of the piece
-    while x < 8 or y < 8:
-        x += 1
-        y += 1
-        if square.empty(x, y):
-            valid_moves.append((x, y))
-        elif (
-            square.piece(x, y).colour.value != square.piece(init_x, init_y).colour.value
-        ):
-            valid_moves.append((x, y))
-            break
-        else:
-            break
 
-    # Check squares bottom left of the piece
-    while x > -1 or y > -1:
-        x -= 1
-        y -= 1
-        if square.empty(x, y):
-            valid_moves.append((x, y))
-        elif (
-            square.piece(x, y).colour.value != square.piece(init_x, init_y).colour.value
-        ):
-            valid_moves.append((x, y))
-            break
-        else:
-            break
+def _sliding_mask(sq: int, deltas) -> int:
+    # relevant-occupancy mask: every ray square whose successor is still on the board
+    mask = 0
+    x0, y0 = sq & 7, sq >> 3
+    for dx, dy in deltas:
+        x, y = x0 + dx, y0 + dy
+        while 0 <= x + dx < 8 and 0 <= y + dy < 8:
+            mask |= 1 << (y * 8 + x)
+            x += dx
+            y += dy
+    return mask
+
 
-    # Check squares bottom right of the piece
-    while x < 8 or y > -1:
-        x += 1
-        y -= 1
-        if square.empty(x, y):
-            valid_moves.append((x, y))
-        elif (
-            square.piece(x, y).colour.value != square.piece(init_x, init_y).colour.value
-        ):
-            valid_moves.append((x, y))
+def _find_magic(sq: int, deltas, rng) -> int:
+    # standard trial-and-error magic search (chessprogramming.org/Looking_for_Magics);
+    # too slow to run at import, so the found constants are frozen below
+    mask = _sliding_mask(sq, deltas)
+    bits = mask.bit_count()
+    shift = 64 - bits
+    subsets = []
+    sub = 0
+    while True:
+        subsets.append((sub, _sliding_attacks(sq, sub, deltas)))
+        sub = (sub - mask) & mask
+        if not sub:
             break
+    while True:
+        magic = rng.getrandbits(64) & rng.getrandbits(64) & rng.getrandbits(64)
+        table = [0] * (1 << bits)
+        for occ, att in subsets:
+            idx = ((occ * magic) & U64) >> shift
+            if not table[idx]:
+                table[idx] = att
+            elif table[idx] != att:
+                break
         else:
-            break
-    return valid_moves
-
-
-def get_valid_moves_knight(square: Board, x: int, y: int) -> list:
-    valid_moves: list = []
-    possible_moves: list = [
-        (x - 2, y + 1),
-        (x - 1, y + 2),
-        (x + 1, y + 2),
-        (x + 2, y + 1),
-        (x + 2, y - 1),
-        (x + 2, y - 2),
-        (x - 1, y - 2),
-        (x - 2, y - 1),
-    ]
-
-    for move in possible_moves:
-        move_x, move_y = move
-        # so it doesn't check out of bound squares
-        print(move_x, move_y)
-        if 8 > move_x > -1 and 8 > move_y > -1:
-            print(square.empty(move_x, move_y))
-            if square.empty(move_x, move_y) == True:
-                print(move)
-                valid_moves.append(move)
-            elif (
-                square.piece(move_x, move_y).colour.value
-                != square.piece(x, y).colour.value
-            ):
-                valid_moves.append(move)
+            return magic
+
+
+# Generated by _find_magic with random.Random(0x5EED); regenerate with
+# [_find_magic(sq, ROOK_DELTAS, rng) for sq in range(64)] (bishops second).
+# Stored (like every table below) as array('Q') so the values sit unboxed in
+# one C-contiguous block instead of a list of PyLongs.
+# fmt: off
+ROOK_MAGIC = array("Q", [
+    0x0080008040089220, 0xA140042000421004,
+    0x0080100160008008, 0x2900050008201000,
+    0x220020A830420004, 0x01000500485C0026,
+    0x0180020010800100, 0x0A00088100482C02,
+    0x04018020C0008000, 0x0100400040201000,
+    0x0285001020004102, 0x0104801004800801,
+    0x02020004210A0010, 0x0002000411081A00,
+    0x001C00160C100108, 0x040080050000C480,
+    0x4010228000814004, 0x000891002101C000,
+    0x0010820021449201, 0x8000120021400A00,
+    0x1415808008000C00, 0x0401010004009802,
+    0x800404004B020830, 0xA201020001005194,
+    0x201080208000C000, 0x1000400080200880,
+    0x6400421200220080, 0x0288008180100068,
+    0x200A002200048810, 0x0021000900040002,
+    0x808008040090090A, 0x040000860021014C,
+    0x0000400070800080, 0x4030022008400041,
+    0x2842004882001020, 0x0090801000800800,
+    0x4024010480800801, 0x4804001002020008,
+    0x0081000451000200, 0x2000804502002084,
+    0x0608400021808000, 0x00A1500020044000,
+    0x011104A000430011, 0xD010100261010008,
+    0x000800800C008008, 0xD106000810120014,
+    0x0800300182040028, 0x0204009400460011,
+    0x0086428011002300, 0x0000804000201280,
+    0x082C200880300080, 0x2008300080180080,
+    0x4000080100045100, 0x4002840002008080,
+    0x2340100806030400, 0x00C0042040810200,
+    0x1C01044480006011, 0x2300402100B20086,
+    0x8026100880220042, 0xC000A00810010005,
+    0x100200205028040A, 0x020100061C001819,
+    0x0829003200008401, 0x01000888410408A2,
+])
+# fmt: on
+
+# fmt: off
+BISHOP_MAGIC = array("Q", [
+    0x0010204801042068, 0x00A00C1106002020,
+    0x0022420042000224, 0x8029040100000030,
+    0x0064146082600014, 0x0002011420102000,
+    0x00008404200C2414, 0x0000121202024001,
+    0x0302210811010400, 0x200108830C058600,
+    0x5801212800888000, 0x4200080943030200,
+    0x1A01A51040280C80, 0x2000022220208348,
+    0x0000231110108400, 0x4008020A0A028202,
+    0x8010000820032C09, 0x0010010206120420,
+    0x0050016202220360, 0x808400084C000800,
+    0x108D025820080004, 0x2120810100600202,
+    0x8041000404020205, 0x0002000B03051120,
+    0x006008008C103408, 0x1A88A02084112208,
+    0x0104100206002440, 0x000C180001220040,
+    0x4011010000904008, 0x0002008004100080,
+    0x0864324202880408, 0x3110410006010128,
+    0x042108490220A008, 0x0042052020040808,
+    0x0024082800040042, 0x40100A8080080200,
+    0x0840030010010040, 0x1001100900802401,
+    0x0802484300004400, 0x0002021200286495,
+    0x010608A440000401, 0x0442441024000810,
+    0x9001201050080800, 0x410000E015010800,
+    0x0104300210122204, 0x4411100D00424600,
+    0x0803100C01000080, 0x0094182210441020,
+    0x0104010818140028, 0x28A0388210100000,
+    0x0000810088311000, 0x8234200205140300,
+    0x018600900A020501, 0x0444085010058000,
+    0x0021061222040100, 0x0806104102008000,
+    0x0007404200A02004, 0x400220C208040608,
+    0x102008448400A800, 0x0001101800208822,
+    0x00000200100A0200, 0x0098020410029200,
+    0x8E081C0448020C0C, 0x8090021008420040,
+])
+# fmt: on
+
+
+def _ray_table(dx: int, dy: int) -> list:
+    # bitboard of every square strictly beyond sq in one direction
+    table = []
+    for sq in range(64):
+        x, y = sq & 7, sq >> 3
+        ray = 0
+        x += dx
+        y += dy
+        while 0 <= x < 8 and 0 <= y < 8:
+            ray |= 1 << (y * 8 + x)
+            x += dx
+            y += dy
+        table.append(ray)
+    return array("Q", table)
+
+
+RAY_NE = _ray_table(1, 1)
+RAY_NW = _ray_table(-1, 1)
+RAY_SE = _ray_table(1, -1)
+RAY_SW = _ray_table(-1, -1)
+
+
+def _diagonal_attacks(sq: int, occ: int) -> int:
+    # classical ray subtraction: the whole ray XOR everything beyond the first
+    # blocker, so the blocker square itself stays attackable. Positive rays
+    # find their blocker with the lowest set bit, negative rays with the
+    # highest. Used to fill (and cross-check) the bishop magic tables.
+    attacks = 0
+    for ray, forward in (
+        (RAY_NE, True),
+        (RAY_NW, True),
+        (RAY_SE, False),
+        (RAY_SW, False),
+    ):
+        ray_bb = ray[sq]
+        blockers = ray_bb & occ
+        if blockers:
+            if forward:
+                first = (blockers & -blockers).bit_length() - 1
             else:
-                pass
-    return valid_moves
-
-
-def get_valid_moves_rook(square: Board, x: int, y: int) -> list:
-    valid_moves: list = []
-    # Check squares to the right of the piece
-    for i in range(1, 8 - x):
-        if square.empty(x + i, y):
-            valid_moves.append((x + i, y))
-        elif square.piece(x + i, y).colour.value != square.piece(x, y).colour.value:
-            valid_moves.append((x + i, y))
-            break
-        else:
-            break
+                first = blockers.bit_length() - 1
+            ray_bb ^= ray[first]
+        attacks |= ray_bb
+    return attacks
 
-    # Check squares to the left of the piece
-    for i in range(1, x + 1):
-        if square.empty(x - i, y):
-            valid_moves.append((x - i, y))
-        elif square.piece(x, y).colour.value != square.piece(y, x - i).colour.value:
-            valid_moves.append((x - i, y))
-            break
-        else:
-            break
 
-    # Check squares above the piece
-    for i in range(1, 8 - y):
-        if square.empty(x, y + i):
-            valid_moves.append((x, y + i))
-        elif square.piece(x, y).colour.value != square.piece(x, y + i).colour.value:
-            valid_moves.append((x, y + i))
-            break
-        else:
-            break
+def _build_magic_tables(deltas, magics, ref_attacks):
+    masks, shifts, tables = [], [], []
+    for sq in range(64):
+        mask = _sliding_mask(sq, deltas)
+        shift = 64 - mask.bit_count()
+        table = [0] * (1 << mask.bit_count())
+        sub = 0
+        while True:
+            table[((sub * magics[sq]) & U64) >> shift] = ref_attacks(sq, sub)
+            sub = (sub - mask) & mask
+            if not sub:
+                break
+        masks.append(mask)
+        shifts.append(shift)
+        tables.append(array("Q", table))
+    return array("Q", masks), array("Q", shifts), tables
 
-    # Check squares below the piece
-    for i in range(1, y + 1):
-        if square.empty(x, y - i):
-            valid_moves.append((x, y - i))
-        elif square.piece(x, y).colour.value != square.piece(x, y - i).colour.value:
-            valid_moves.append((x, y - i))
-            break
-        else:
-            break
-    return valid_moves
-
-
-def get_valid_moves_queen(square: Board, x: int, y: int) -> list:
-    valid_moves: list = [
-        get_valid_moves_bishop(square, x, y) + get_valid_moves_rook(square, x, y)
-    ]
-    return valid_moves
-
-
-def get_possible_moves_king(square: Board, x: int, y: int) -> list:
-    possible_moves: list = []
-    moves: list = [
-        # all adjacent squares going clockwise starting from above
-        (x, y + 1),
-        (x + 1, y + 1),
-        (x + 1, y),
-        (x + 1, y - 1),
-        (x, y - 1),
-        (x - 1, y - 1),
-        (x - 1, y),
-        (x - 1, y + 1),
-    ]
-
-    for move in moves:
-        move_x, move_y = move
-
-        if square.empty(move_x, move_y):
-            possible_moves.append(move)
-        elif (
-            square.piece(move_x, move_y).colour.value != square.piece(x, y).colour.value
-        ):
-            possible_moves.append(move)
-        else:
-            pass
-    return possible_moves
+
+ROOK_MASK, ROOK_SHIFT, ROOK_ATTACKS = _build_magic_tables(
+    ROOK_DELTAS, ROOK_MAGIC, lambda sq, occ: _sliding_attacks(sq, occ, ROOK_DELTAS)
+)
+BISHOP_MASK, BISHOP_SHIFT, BISHOP_ATTACKS = _build_magic_tables(
+    BISHOP_DELTAS, BISHOP_MAGIC, _diagonal_attacks
+)
+
+
+def rook_attacks(sq: int, occ: int) -> int:
+    idx = ((occ & ROOK_MASK[sq]) * ROOK_MAGIC[sq] & U64) >> ROOK_SHIFT[sq]
+    return ROOK_ATTACKS[sq][idx]
+
+
+def bishop_attacks(sq: int, occ: int) -> int:
+    idx = ((occ & BISHOP_MASK[sq]) * BISHOP_MAGIC[sq] & U64) >> BISHOP_SHIFT[sq]
+    return BISHOP_ATTACKS[sq][idx]
+
+
+# Kernels: pure functions of (occupancy, own occupancy, square index). Kept
+# free of Piece objects, lists-of-tuples and enum arguments so a later
+# NumPy/numba pass can compile them without restructuring; jitting them as-is
+# does not work (the lookup tables would need to become flat uint64 arrays
+# first), so they are deliberately left undecorated until that lands.
+def _rook_moves(occ: int, own: int, sq: int) -> int:
+    return rook_attacks(sq, occ) & ~own
+
+
+def _bishop_moves(occ: int, own: int, sq: int) -> int:
+    return bishop_attacks(sq, occ) & ~own
+
+
+def _queen_moves(occ: int, own: int, sq: int) -> int:
+    return (bishop_attacks(sq, occ) | rook_attacks(sq, occ)) & ~own
+
+
+def _knight_moves(own: int, sq: int) -> int:
+    return KNIGHT_ATTACKS[sq] & ~own
+
+
+def _king_moves(own: int, sq: int) -> int:
+    return KING_ATTACKS[sq] & ~own
+
+
+def _pawn_moves(occ: int, enemy: int, sq: int, colour: int) -> int:
+    bit = 1 << sq
+    moves = PAWN_ATTACKS[colour][sq] & enemy
+    if colour == 0:
+        # mask with U64: a pawn on the last rank must not push off the board
+        one = (bit << 8) & ~occ & U64
+        moves |= one
+        # double push only from the start rank and only if the single push ran
+        if one and bit & RANK_2:
+            moves |= (bit << 16) & ~occ & U64
+    else:
+        one = (bit >> 8) & ~occ
+        moves |= one
+        if one and bit & RANK_7:
+            moves |= (bit >> 16) & ~occ
+    return moves
+
+
+def _jump_attacks(offsets) -> list:
+    # 64-entry table for fixed-shape movers (knight, king); wrap is avoided
+    # by bounds-checking the target file/rank before setting the bit
+    table = []
+    for sq in range(64):
+        x, y = sq & 7, sq >> 3
+        bb = 0
+        for dx, dy in offsets:
+            if 0 <= x + dx < 8 and 0 <= y + dy < 8:
+                bb |= 1 << ((y + dy) * 8 + (x + dx))
+        table.append(bb)
+    return array("Q", table)
+
+
+KNIGHT_ATTACKS = _jump_attacks(
+    ((-2, 1), (-1, 2), (1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1))
+)
+KING_ATTACKS = _jump_attacks(
+    ((0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1), (-1, 0), (-1, 1))
+)
+
+# pawn capture targets per colour (white attacks up the board, black down)
+PAWN_ATTACKS = (
+    _jump_attacks(((-1, 1), (1, 1))),
+    _jump_attacks(((-1, -1), (1, -1))),
+)
+
+RANK_2 = 0x000000000000FF00
+RANK_7 = 0x00FF000000000000
+
+
+def iter_bits(bb: int):
+    while bb:
+        yield (bb & -bb).bit_length() - 1
+        bb &= bb - 1
+
+
+def bits_to_squares(bb: int) -> list:
+    return [(sq & 7, sq >> 3) for sq in iter_bits(bb)]
+
+
+def get_valid_moves_pawn(square: Board, x: int, y: int) -> int:
+    sq = y * 8 + x
+    if (square.occ_w >> sq) & 1:
+        return _pawn_moves(square.occ, square.occ_b, sq, 0)
+    if (square.occ_b >> sq) & 1:
+        return _pawn_moves(square.occ, square.occ_w, sq, 1)
+    return 0
+
+
+def get_valid_moves_bishop(square: Board, x: int, y: int) -> int:
+    sq = y * 8 + x
+    own = square.occ_w if (square.occ_w >> sq) & 1 else square.occ_b
+    return _bishop_moves(square.occ, own, sq)
+
+
+def get_valid_moves_knight(square: Board, x: int, y: int) -> int:
+    sq = y * 8 + x
+    own = square.occ_w if (square.occ_w >> sq) & 1 else square.occ_b
+    return _knight_moves(own, sq)
+
+
+def get_valid_moves_rook(square: Board, x: int, y: int) -> int:
+    sq = y * 8 + x
+    own = square.occ_w if (square.occ_w >> sq) & 1 else square.occ_b
+    return _rook_moves(square.occ, own, sq)
+
+
+def get_valid_moves_queen(square: Board, x: int, y: int) -> int:
+    sq = y * 8 + x
+    own = square.occ_w if (square.occ_w >> sq) & 1 else square.occ_b
+    return _queen_moves(square.occ, own, sq)
+
+
+def get_possible_moves_king(square: Board, x: int, y: int) -> int:
+    sq = y * 8 + x
+    own = square.occ_w if (square.occ_w >> sq) & 1 else square.occ_b
+    return _king_moves(own, sq)
+
+
+@lru_cache(maxsize=1 << 20)
+def get_valid_moves_cached(
+    zhash: int, sq: int, piece_type: int, colour: int, occ_w: int, occ_b: int
+) -> int:
+    # Keyed on primitives so hashing the cache key stays cheap. The Zobrist
+    # hash stands in for the position, so transpositions reuse entries; the
+    # occupancies ride along because they are all the kernels actually need.
+    occ = occ_w | occ_b
+    own = occ_w if colour == Colour.WHITE else occ_b
+    if piece_type == PieceType.PAWN:
+        return _pawn_moves(occ, occ ^ own, sq, colour)
+    if piece_type == PieceType.KNIGHT:
+        return _knight_moves(own, sq)
+    if piece_type == PieceType.BISHOP:
+        return _bishop_moves(occ, own, sq)
+    if piece_type == PieceType.ROOK:
+        return _rook_moves(occ, own, sq)
+    if piece_type == PieceType.QUEEN:
+        return _queen_moves(occ, own, sq)
+    if piece_type == PieceType.KING:
+        return _king_moves(own, sq)
+    return 0
@@ -1,20 +1,21 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from enum import Enum
+from dataclasses import dataclass, field
+from enum import IntEnum
 
 
-class PieceType(Enum):
-    EMPTY = "empty"
-    PAWN = "pawn"
-    ROOK = "rook"
-    BISHOP = "bishop"
-    QUEEN = "queen"
-    KNIGHT = "knight"
-    KING = "king"
+class PieceType(IntEnum):
+    # numeric values double as the per-colour bitboard index on Board
+    EMPTY = -1
+    PAWN = 0
+    KNIGHT = 1
+    BISHOP = 2
+    ROOK = 3
+    QUEEN = 4
+    KING = 5
 
 
-class Colour(Enum):
+class Colour(IntEnum):
     NONE = -1
     WHITE = 0
     BLACK = 1
@@ -41,7 +42,7 @@ FEN_MAP: dict[str, PieceType] = {
 }
 
 
-@dataclass
+@dataclass(slots=True)
 class Piece:
     x: int
     y: int
@@ -50,6 +51,8 @@ class Piece:
     has_moved: bool = False
     moves_made: int = 0
     last_moved: int = 0
+    # lazily cached glyph; reset whenever the piece type changes
+    _str: str | None = field(default=None, repr=False, compare=False)
 
     @staticmethod
     def from_fen(x: int, y: int, fen: str) -> Piece:
@@ -63,10 +66,13 @@ class Piece:
 
     def promote_to_queen(self) -> None:
         self.type = PieceType.QUEEN
+        self._str = None
 
     @property
     def image(self) -> str:
-        return f"pieces/{self.type}{self.colour.value.value}.png"
+        return f"pieces/{self.type.name.lower()}{self.colour.value}.png"
 
     def __str__(self):
-        return PIECE_STR[self.type][self.colour.value]
+        if self._str is None:
+            self._str = PIECE_STR[self.type][self.colour]
+        return self._str